@@ -1,20 +1,174 @@
+from collections import defaultdict
 import csv
-import matplotlib.pyplot as plt
+from functools import lru_cache
+from multiprocessing import Pool
+import io
+import os
+import warnings
+from matplotlib.figure import Figure
 import numpy as np
+import pandas as pd
+from numba import njit
 from jinja2 import Environment, FileSystemLoader
 import pdfkit
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.utils import get_column_letter
-from openpyxl.styles import Font, Border, Side
+from openpyxl.styles import Font, Border, Side, NamedStyle
 import doctest
 
+COLUMNS = ['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at']
+DTYPES = {'name': 'str', 'salary_from': 'float32', 'salary_to': 'float32', 'salary_currency': 'category',
+          'area_name': 'category', 'published_at': 'str'}
+NA_VALUES = {column: [''] for column in COLUMNS}
+CHUNK_BYTES_MIN = 1 << 22
+CHUNK_BYTES_MAX = 1 << 26
+YEAR_DIGITS = np.array([1000, 100, 10, 1], dtype=np.int16)
+JINJA_ENV = Environment(loader=FileSystemLoader('templates'), auto_reload=False)
+
+
+def get_salary_avg(salary, amount):
+    """Возвращает среднюю зарплату по суммам и количествам вакансий
+    :param salary:
+        (dict): Сумма зарплат по ключам
+    :param amount:
+        (dict): Количество вакансий по ключам
+    :return:
+        (dict): Средняя зарплата по ключам
+
+    >>> get_salary_avg({2007: 30.0, 2008: 0}, {2007: 2, 2008: 0})
+    {2007: 15, 2008: 0}
+    """
+    return {key: 0 if amount[key] == 0 else int(value / amount[key]) for key, value in salary.items()}
+
 
-def get_salary_avg(dct):
-    for key, value in dct.items():
-        dct[key] = 0 if len(value) == 0 else int(sum(value) / len(value))
+def add_totals(dct, keys, values):
+    """Прибавляет частичные итоги по чанку к накопленным
+    :param dct:
+        (defaultdict): Накопленные итоги
+    :param keys:
+        (np.ndarray): Ключи итогов по чанку
+    :param values:
+        (np.ndarray): Итоги по чанку
+
+    >>> dict(add_totals(defaultdict(int, {2007: 1}), np.array([2007, 2008]), np.array([2, 3])))
+    {2007: 3, 2008: 3}
+    """
+    for key, value in zip(keys.tolist(), values.tolist()):
+        dct[key] += value
     return dct
 
 
+@lru_cache(maxsize=None)
+def get_pdf_configuration():
+    """Возвращает конфигурацию pdfkit, созданную при первом вызове
+    (pdfkit.configuration проверяет наличие wkhtmltopdf, поэтому не вызывается при импорте модуля).
+    Путь к wkhtmltopdf берется из переменной окружения WKHTMLTOPDF, иначе wkhtmltopdf ищется в PATH
+    :return:
+        (pdfkit.configuration.Configuration): Конфигурация wkhtmltopdf
+    """
+    return pdfkit.configuration(wkhtmltopdf=os.environ.get('WKHTMLTOPDF', ''))
+
+
+def get_published_years(published_at):
+    """Возвращает годы публикации, собирая их из первых четырёх ASCII-байтов дат
+    :param published_at:
+        (pd.Series): Даты публикации вакансий
+    :return:
+        (np.ndarray): Годы публикации (int16)
+
+    >>> get_published_years(pd.Series(['2007-12-03T17:34:36+0300', '2022-07-05T18:19:30+0300'])).tolist()
+    [2007, 2022]
+    """
+    digits = published_at.to_numpy(dtype='S4').view(np.uint8).reshape(-1, 4)
+    return (digits.astype(np.int16) - 48) @ YEAR_DIGITS
+
+
+def get_top(values, n=10):
+    """Возвращает индексы n наибольших значений в порядке убывания
+    :param values:
+        (np.ndarray): Значения
+    :param n:
+        (int): Количество индексов
+    :return:
+        (np.ndarray): Индексы наибольших значений
+
+    >>> get_top(np.array([1, 5, 3, 4]), 2).tolist()
+    [1, 3]
+    >>> get_top(np.array([2, 1]), 10).tolist()
+    [0, 1]
+    """
+    if values.size > n:
+        top = np.sort(np.argpartition(-values, n - 1)[:n])
+    else:
+        top = np.arange(values.size)
+    return top[np.argsort(-values[top], kind='stable')]
+
+
+def get_styled_row(ws, row, styles):
+    """Возвращает строку ячеек для листа в потоковом режиме с именованными стилями
+    :param ws:
+        (WriteOnlyWorksheet): Лист книги
+    :param row:
+        (list): Значения ячеек
+    :param styles:
+        (list): Названия стилей ячеек (None - без стиля)
+    :return:
+        (list): Ячейки WriteOnlyCell
+    """
+    cells = []
+    for value, style in zip(row, styles):
+        cell = WriteOnlyCell(ws, value=value)
+        if style is not None:
+            cell.style = style
+        cells.append(cell)
+    return cells
+
+
+@njit(cache=True, fastmath=True)
+def aggregate(salary_from, salary_to, currency_id, city_id, year_id, rates, name_match, n_years, n_cities):
+    """Считает суммы зарплат и количества вакансий по годам и городам за один проход
+    :param salary_from:
+        (np.ndarray): Нижние границы вилки оклада (float32)
+    :param salary_to:
+        (np.ndarray): Верхние границы вилки оклада (float32)
+    :param currency_id:
+        (np.ndarray): Номера валют оклада в rates (int8)
+    :param city_id:
+        (np.ndarray): Номера городов (int32)
+    :param year_id:
+        (np.ndarray): Номера годов публикации, начиная с 0 (int16)
+    :param rates:
+        (np.ndarray): Курсы валют к рублю (float32)
+    :param name_match:
+        (np.ndarray): Маска вакансий с выбранным названием (bool)
+    :param n_years:
+        (int): Количество годов
+    :param n_cities:
+        (int): Количество городов
+    :return:
+        (tuple): Массивы сумм и количеств в порядке, возвращаемом DataSet.parse_csv
+    """
+    salary = np.zeros(n_years)
+    amount = np.zeros(n_years, dtype=np.int64)
+    vacancy_salary = np.zeros(n_years)
+    vacancy_amount = np.zeros(n_years, dtype=np.int64)
+    salary_city = np.zeros(n_cities)
+    share_city = np.zeros(n_cities, dtype=np.int64)
+    for i in range(salary_from.size):
+        mean = round(0.5 * (salary_from[i] + salary_to[i]) * rates[currency_id[i]], 1)
+        year = year_id[i]
+        city = city_id[i]
+        salary[year] += mean
+        amount[year] += 1
+        salary_city[city] += mean
+        share_city[city] += 1
+        if name_match[i]:
+            vacancy_salary[year] += mean
+            vacancy_amount[year] += 1
+    return salary, amount, vacancy_salary, vacancy_amount, salary_city, share_city
+
+
 class Vacancy:
     """
     Класс представления параметров вакансии
@@ -42,6 +196,7 @@ class Vacancy:
     >>> Vacancy({'name': '', 'salary_from': '1', 'salary_to': '2', 'salary_currency': '', 'area_name': '', 'published_at': '2007-12-03T17:34:36+0300'}).published_at
     '2007-12-03T17:34:36+0300'
     """
+    __slots__ = ('name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at')
     currency_to_rub = {"AZN": 35.68, "BYR": 23.91, "EUR": 59.90, "GEL": 21.74, "KGS": 0.76,
                        "KZT": 0.13, "RUR": 1, "UAH": 1.64, "USD": 60.66, "UZS": 0.0055}
 
@@ -90,6 +245,87 @@ class Vacancy:
         return int(self.published_at[:self.published_at.find('-')])
 
 
+CURRENCIES = list(Vacancy.currency_to_rub)
+RATES = np.array(list(Vacancy.currency_to_rub.values()), dtype=np.float32)
+
+
+def aggregate_chunk(chunk, vacancy_name):
+    """Считает частичные итоги по чанку вакансий
+    :param chunk:
+        (pd.DataFrame): Чанк вакансий
+    :param vacancy_name:
+        (str): Название выбранной вакансии
+    :return:
+        count (int): Количество вакансий в чанке
+        totals (list): Тройки (ключи, суммы зарплат, количества вакансий) по годам, по годам для выбранной
+            вакансии и по городам
+    """
+    chunk = chunk.assign(salary_currency=chunk['salary_currency'].cat.set_categories(CURRENCIES)).dropna()
+    if chunk.empty:
+        return 0, []
+    year = get_published_years(chunk['published_at'])
+    year_min = year.min()
+    years = np.arange(year.max() - year_min + 1) + year_min
+    city_id = chunk['area_name'].cat.codes.to_numpy(dtype=np.int32)
+    cities = np.asarray(chunk['area_name'].cat.categories)
+    match = chunk['name'].str.contains(vacancy_name, regex=False).to_numpy()
+
+    sums = aggregate(chunk['salary_from'].to_numpy(dtype=np.float32), chunk['salary_to'].to_numpy(dtype=np.float32),
+                     chunk['salary_currency'].cat.codes.to_numpy(dtype=np.int8), city_id, year - year_min, RATES,
+                     match, years.size, cities.size)
+    totals = []
+    for keys, chunk_sums, chunk_amounts in zip((years, years, cities), sums[::2], sums[1::2]):
+        present = chunk_amounts > 0
+        totals.append((keys[present], chunk_sums[present], chunk_amounts[present]))
+    return len(chunk), totals
+
+
+def get_byte_ranges(file_name, n_ranges):
+    """Делит строки файла после заголовка на диапазоны байтов примерно равного размера
+    :param file_name:
+        (str): Название файла
+    :param n_ranges:
+        (int): Желаемое количество диапазонов
+    :return:
+        (list): Пары (начало, конец) диапазонов
+    """
+    with open(file_name, 'rb') as file:
+        file.readline()
+        start = file.tell()
+        size = file.seek(0, os.SEEK_END)
+    step = min(max((size - start) // n_ranges, CHUNK_BYTES_MIN), CHUNK_BYTES_MAX)
+    return [(offset, min(offset + step, size)) for offset in range(start, size, step)]
+
+
+def parse_byte_range(task):
+    """Парсит строки, начинающиеся в диапазоне байтов файла, и считает по ним частичные итоги
+    :param task:
+        (tuple): Название файла, начало и конец диапазона, название выбранной вакансии
+    :return:
+        (tuple): Частичные итоги aggregate_chunk
+    """
+    file_name, start, end, vacancy_name = task
+    with open(file_name, 'rb') as file:
+        titles = file.readline()
+        file.seek(start - 1)
+        file.readline()
+        position = file.tell()
+        if position >= end:
+            return 0, []
+        data = file.read(end - position)
+        if not data.endswith(b'\n'):
+            data += file.readline()
+    # Столбец _extra непуст только у строк с лишними полями. Строки с двумя и более лишними полями
+    # pandas пропускает сам, кроме первой строки диапазона: её он обрезает до _extra с ParserWarning
+    names = next(csv.reader([titles.decode('utf-8-sig')])) + ['_extra']
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', pd.errors.ParserWarning)
+        chunk = pd.read_csv(io.BytesIO(data), encoding='utf-8', header=None, names=names,
+                            dtype=dict(DTYPES, _extra='str'), keep_default_na=False, na_values=NA_VALUES,
+                            index_col=False, on_bad_lines='skip')
+    return aggregate_chunk(chunk.loc[chunk['_extra'].fillna('') == '', COLUMNS], vacancy_name)
+
+
 class DataSet:
     """Класс для представления данных о вакансиях
     :Attributes:
@@ -114,65 +350,40 @@ class DataSet:
         self.vacancy_name = name
 
     def parse_csv(self):
-        """Парсит сырые данных из файла по словарям
+        """Парсит сырые данные из файла параллельно по диапазонам байтов и накапливает итоги в словарях
         :return:
-            salary (dict): Зарплата по годам
+            salary (dict): Сумма зарплат по годам
             amount (dict): Количество вакансий по годам
-            vacancy_salary (dict): Зарплата по годам для выбранной вакансии
+            vacancy_salary (dict): Сумма зарплат по годам для выбранной вакансии
             vacancy_amount (dict): Количество вакансий по годам для выбранной вакансии
-            salary_city (dict): Зарплата по городам
+            salary_city (dict): Сумма зарплат по городам
             share_city(dict): Количество по городам
             count (int): Общее количество всех вакансий
         """
-        salary = dict()
-        amount = dict()
-        vacancy_salary = dict()
-        vacancy_amount = dict()
-        salary_city = dict()
-        share_city = dict()
+        salary = defaultdict(float)
+        amount = defaultdict(int)
+        vacancy_salary = defaultdict(float)
+        vacancy_amount = defaultdict(int)
+        salary_city = defaultdict(float)
+        share_city = defaultdict(int)
         count = 0
-        with open(self.file_name, encoding='utf-8-sig') as vacancies:
-            rows = list(csv.reader(vacancies))
-            titles = rows[0]
-            for row in rows[1:]:
-                if not (len(row) == len(titles) and all(row)):
-                    continue
-                vacancy = Vacancy(dict(zip(titles, row)))
-                count += 1
-                mean_salary = vacancy.get_average_rub_salary()
-                city = vacancy.area_name
-                year = vacancy.get_published_vacancy_year()
-                if year not in salary:
-                    salary[year] = [mean_salary]
-                else:
-                    salary[year] += [mean_salary]
-
-                if year not in amount:
-                    amount[year] = 1
-                else:
-                    amount[year] += 1
-
-                if city not in salary_city:
-                    salary_city[city] = [mean_salary]
-                else:
-                    salary_city[city] += [mean_salary]
-
-                if city not in share_city:
-                    share_city[city] = 1
-                else:
-                    share_city[city] += 1
-
-                if self.vacancy_name in vacancy.name:
-                    if year not in vacancy_salary:
-                        vacancy_salary[year] = [mean_salary]
-                    else:
-                        vacancy_salary[year] += [mean_salary]
-                    if year not in vacancy_amount:
-                        vacancy_amount[year] = 1
-                    else:
-                        vacancy_amount[year] += 1
-
-            return salary, amount, vacancy_salary, vacancy_amount, salary_city, share_city, count
+        processes = os.cpu_count() or 1
+        tasks = [(self.file_name, start, end, self.vacancy_name)
+                 for start, end in get_byte_ranges(self.file_name, processes * 4)]
+        if len(tasks) > 1:
+            with Pool(min(processes, len(tasks))) as pool:
+                results = list(pool.imap(parse_byte_range, tasks))
+        else:
+            results = map(parse_byte_range, tasks)
+        for chunk_count, totals in results:
+            count += chunk_count
+            for (sums, amounts), (keys, chunk_sums, chunk_amounts) in zip(
+                    ((salary, amount), (vacancy_salary, vacancy_amount), (salary_city, share_city)), totals):
+                add_totals(sums, keys, chunk_sums)
+                add_totals(amounts, keys, chunk_amounts)
+
+        return (dict(sorted(salary.items())), dict(sorted(amount.items())), dict(sorted(vacancy_salary.items())),
+                dict(sorted(vacancy_amount.items())), dict(salary_city), dict(share_city), count)
 
     def get_clear_data(self):
         """Преобразует сырые данные из метода parse_csv
@@ -185,24 +396,27 @@ class DataSet:
             share_city(dict): Доля вакансий по городам (В порядке убывания)
         """
         salary, amount, vacancy_salary, vacancy_amount, salary_city, share_city, count = self.parse_csv()
-        salary = get_salary_avg(salary)
-        vacancy_salary = get_salary_avg(vacancy_salary)
-        for k, v in share_city.items():
-            share_city[k] = round(v / count, 4)
-        share_city = list(filter(lambda x: x[-1] > 0.01, [(key, value) for key, value in share_city.items()]))
+        salary = get_salary_avg(salary, amount)
+        vacancy_salary = get_salary_avg(vacancy_salary, vacancy_amount)
 
-        salary_city = dict(
-            sorted([(key, value) for key, value in get_salary_avg(salary_city).items() if key in dict(share_city)],
-                   key=lambda x: x[-1], reverse=True)[:10])
+        cities = np.array(list(share_city), dtype=object)
+        city_amount = np.fromiter(share_city.values(), dtype=np.int64, count=cities.size)
+        city_salary = np.fromiter((salary_city[city] for city in cities), dtype=np.float64, count=cities.size)
+        share = np.round(city_amount / count, 4)
+        keep = share > 0.01
+        cities, share = cities[keep], share[keep]
+        city_salary = (city_salary[keep] / city_amount[keep]).astype(np.int64)
 
-        return salary, amount, vacancy_salary, vacancy_amount, salary_city, dict(
-            sorted(share_city, key=lambda x: x[-1], reverse=True)[:10])
+        top_salary = get_top(city_salary)
+        top_share = get_top(share)
+        salary_city = dict(zip(cities[top_salary].tolist(), city_salary[top_salary].tolist()))
+        share_city = dict(zip(cities[top_share].tolist(), share[top_share].tolist()))
+        return salary, amount, vacancy_salary, vacancy_amount, salary_city, share_city
 
 
 class Report:
     """Класс для представления отчётов
     Attributes:
-        wb (Workbook): Workbook is the container for all other parts of the document
         vacancy_name (str): Название выбранной вакансии
         salary (dict): Средняя зарплата по годам
         amount (dict): Количество вакансий по годам
@@ -215,6 +429,10 @@ class Report:
     'Report'
     >>>
     """
+    _THIN = Side(border_style='thin', color='00000000')
+    _CELL_BORDER = Border(left=_THIN, bottom=_THIN, right=_THIN, top=_THIN)
+    _BOLD = Font(bold=True)
+
     def __init__(self, vacancy_name: str, salary: dict, amount: dict, this_vacancy_salary: dict, this_vacancy_amount: dict, salary_city: dict, share_city: dict):
         """Инициализирует класс Report
         :param:
@@ -232,7 +450,6 @@ class Report:
         :param:
             share_city(dict): Доля вакансий по городам (В порядке убывания)
         """
-        self.wb = Workbook()
         self.vacancy_name = vacancy_name
         self.salary = salary
         self.amount = amount
@@ -240,136 +457,147 @@ class Report:
         self.this_vacancy_amount = this_vacancy_amount
         self.salary_city = salary_city
         self.share_city = share_city
+        self._fig = None
+        self._axes = None
+        self._bars = None
+        self._image_keys = None
 
     def generate_image(self):
-        """Формирует отчет в виде graph.png с графиками"""
-        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(nrows=2, ncols=2)
-
-        bar1 = ax1.bar(np.array(list(self.salary.keys())) - 0.4, self.salary.values(), width=0.4)
-        bar2 = ax1.bar(np.array(list(self.salary.keys())), self.this_vacancy_salary.values(), width=0.4)
+        """Формирует отчет в виде graph.png с графиками
+        (если годы и города не изменились с прошлого вызова, обновляются только столбцы и круговая диаграмма)
+        """
+        keys = (list(self.salary), list(self.this_vacancy_salary), list(self.amount), list(self.this_vacancy_amount),
+                list(self.salary_city), list(self.share_city))
+        if self._fig is None or keys != self._image_keys:
+            self._draw_image()
+            self._image_keys = keys
+        else:
+            self._update_image()
+        self._fig.savefig('graph.png', dpi=100)
+
+    def _draw_image(self):
+        """Строит все графики отчета заново"""
+        if self._fig is None:
+            self._fig = Figure(constrained_layout=True)
+        else:
+            self._fig.clf()
+        (ax1, ax2), (ax3, ax4) = self._fig.subplots(nrows=2, ncols=2)
+
+        salary_years = np.fromiter(self.salary.keys(), dtype=np.int16, count=len(self.salary))
+        amount_years = np.fromiter(self.amount.keys(), dtype=np.int16, count=len(self.amount))
+
+        bar1 = ax1.bar(salary_years - 0.4, self.salary.values(), width=0.4)
+        bar2 = ax1.bar(salary_years, self.this_vacancy_salary.values(), width=0.4)
         ax1.set_title('Уровень зарплат по годам', fontdict={'fontsize': 8})
         ax1.grid(axis='y')
         ax1.legend((bar1[0], bar2[0]), ('средняя з/п', 'з/п ' + self.vacancy_name.lower()), prop={'size': 8})
-        ax1.set_xticks(np.array(list(self.salary.keys())) - 0.2, list(self.salary.keys()), rotation=90)
+        ax1.set_xticks(salary_years - 0.2, salary_years.tolist(), rotation=90)
         ax1.xaxis.set_tick_params(labelsize=8)
         ax1.yaxis.set_tick_params(labelsize=8)
 
         ax2.set_title('Количество вакансий по годам', fontdict={'fontsize': 8})
-        bar1 = ax2.bar(np.array(list(self.amount.keys())) - 0.4, self.amount.values(), width=0.4)
-        bar2 = ax2.bar(np.array(list(self.amount.keys())), self.this_vacancy_amount.values(), width=0.4)
-        ax2.legend((bar1[0], bar2[0]), ('Количество вакансий', 'Количество вакансий\n' + self.vacancy_name.lower()),
+        bar3 = ax2.bar(amount_years - 0.4, self.amount.values(), width=0.4)
+        bar4 = ax2.bar(amount_years, self.this_vacancy_amount.values(), width=0.4)
+        ax2.legend((bar3[0], bar4[0]), ('Количество вакансий', 'Количество вакансий\n' + self.vacancy_name.lower()),
                    prop={'size': 8})
-        ax2.set_xticks(np.array(list(self.amount.keys())) - 0.2, list(self.amount.keys()), rotation=90)
+        ax2.set_xticks(amount_years - 0.2, amount_years.tolist(), rotation=90)
         ax2.grid(axis='y')
         ax2.xaxis.set_tick_params(labelsize=8)
         ax2.yaxis.set_tick_params(labelsize=8)
 
         ax3.set_title('Уровень зарплат по городам', fontdict={'fontsize': 8})
-        ax3.barh(list([str(a).replace(' ', '\n').replace('-', '-\n') for a in reversed(list(self.salary_city.keys()))]),
-                 list(reversed(list(self.salary_city.values()))), color='blue', height=0.5, align='center')
+        bar5 = ax3.barh(
+            list([str(a).replace(' ', '\n').replace('-', '-\n') for a in reversed(list(self.salary_city.keys()))]),
+            list(reversed(list(self.salary_city.values()))), color='blue', height=0.5, align='center')
         ax3.yaxis.set_tick_params(labelsize=6)
         ax3.xaxis.set_tick_params(labelsize=8)
         ax3.grid(axis='x')
 
-        ax4.set_title('Доля вакансий по городам', fontdict={'fontsize': 8})
+        self._draw_share_pie(ax4)
+        self._axes = (ax1, ax2, ax3, ax4)
+        self._bars = (bar1, bar2, bar3, bar4, bar5)
+
+    def _update_image(self):
+        """Обновляет высоты столбцов и круговую диаграмму на уже построенных графиках"""
+        ax1, ax2, ax3, ax4 = self._axes
+        bar1, bar2, bar3, bar4, bar5 = self._bars
+        for bars, values in ((bar1, self.salary.values()), (bar2, self.this_vacancy_salary.values()),
+                             (bar3, self.amount.values()), (bar4, self.this_vacancy_amount.values())):
+            for bar, value in zip(bars, values):
+                bar.set_height(value)
+        for bar, value in zip(bar5, reversed(list(self.salary_city.values()))):
+            bar.set_width(value)
+        for ax in (ax1, ax2, ax3):
+            ax.relim()
+            ax.autoscale_view()
+        ax4.clear()
+        self._draw_share_pie(ax4)
+
+    def _draw_share_pie(self, ax):
+        """Строит круговую диаграмму долей вакансий по городам
+        :param ax:
+            (Axes): Оси для диаграммы
+        """
+        ax.set_title('Доля вакансий по городам', fontdict={'fontsize': 8})
         other = 1 - sum([value for value in self.share_city.values()])
-        ax4.pie(list(self.share_city.values()) + [other], labels=list(self.share_city.keys()) + ['Другие'],
-                textprops={'fontsize': 6})
-
-        plt.tight_layout()
-        plt.savefig('graph.png')
+        ax.pie(list(self.share_city.values()) + [other], labels=list(self.share_city.keys()) + ['Другие'],
+               textprops={'fontsize': 6})
 
     def generate_pdf(self):
         """Формирует отчет в виде pdf-файла со статистикой и графиками"""
-        template = Environment(loader=FileSystemLoader('templates')).get_template("pdf.html")
-        statistic = []
-        for year in self.salary:
-            statistic.append([year, self.salary[year], self.this_vacancy_salary[year], self.amount[year],
-                              self.this_vacancy_amount[year]])
-        for key, value in self.share_city.items():
-            self.share_city[key] = str(round(value * 100, 2)) + '%'
-        pdf = template.render({'name': dataset.vacancy_name,
-                               'path': r'C:\Users\ilyam\PycharmProjects\pythonProject\graph.png',
-                               'statistic': statistic, 'salary_city': self.salary_city,
-                               'share_city': self.share_city})
-        config = pdfkit.configuration(wkhtmltopdf=r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe')
-        pdfkit.from_string(pdf, 'report.pdf', configuration=config, options={"enable-local-file-access": ""})
+        template = JINJA_ENV.get_template("pdf.html")
+        statistic = [[year, self.salary[year], self.this_vacancy_salary[year], self.amount[year],
+                      self.this_vacancy_amount[year]] for year in self.salary]
+        share_city = {key: str(round(value * 100, 2)) + '%' for key, value in self.share_city.items()}
+        template.stream({'name': self.vacancy_name, 'path': os.path.abspath('graph.png'),
+                         'statistic': statistic, 'salary_city': self.salary_city,
+                         'share_city': share_city}).dump('report.html', encoding='utf-8')
+        pdfkit.from_file('report.html', 'report.pdf', configuration=get_pdf_configuration(),
+                         options={"enable-local-file-access": "", "encoding": "UTF-8"})
 
     def generate_excel(self):
-        """Формирует статистику в виде .xlsx"""
-        ws1 = self.wb.active
-        ws1.title = 'Статистика по годам'
-        ws1.append(['Год', 'Средняя зарплата', 'Средняя зарплата - ' + self.vacancy_name, 'Количество вакансий',
-                    'Количество вакансий - ' + self.vacancy_name])
+        """Формирует статистику в виде .xlsx в потоковом режиме openpyxl"""
+        wb = Workbook(write_only=True)
+        for style in (NamedStyle('report_header', font=Report._BOLD, border=Report._CELL_BORDER),
+                      NamedStyle('report_cell', border=Report._CELL_BORDER),
+                      NamedStyle('report_percent', border=Report._CELL_BORDER, number_format='0.00%')):
+            wb.add_named_style(style)
+
+        ws1 = wb.create_sheet('Статистика по годам')
+        titles = ['Год', 'Средняя зарплата', 'Средняя зарплата - ' + self.vacancy_name, 'Количество вакансий',
+                  'Количество вакансий - ' + self.vacancy_name]
+        for i, title in enumerate(titles, 1):
+            ws1.column_dimensions[get_column_letter(i)].width = len(title) + 3
+        ws1.append(get_styled_row(ws1, titles, ['report_header'] * 5))
         for year in self.salary:
-            ws1.append([year, self.salary[year], self.this_vacancy_salary[year], self.amount[year],
-                        self.this_vacancy_amount[year]])
-
-        data = [['Год ', 'Средняя зарплата ', ' Средняя зарплата - ' + self.vacancy_name, ' Количество вакансий',
-                 ' Количество вакансий - ' + self.vacancy_name]]
-        column_widths = []
-        for row in data:
-            for i, cell in enumerate(row):
-                if len(column_widths) > i:
-                    if len(cell) > column_widths[i]:
-                        column_widths[i] = len(cell)
-                else:
-                    column_widths += [len(cell)]
-
-        for i, column_width in enumerate(column_widths, 1):  # ,1 to start at 1
-            ws1.column_dimensions[get_column_letter(i)].width = column_width + 2
+            ws1.append(get_styled_row(ws1, [year, self.salary[year], self.this_vacancy_salary[year], self.amount[year],
+                                            self.this_vacancy_amount[year]], ['report_cell'] * 5))
 
         data = [['Город', 'Уровень зарплат', '', 'Город', 'Доля вакансий']]
         for (city1, value1), (city2, value2) in zip(self.salary_city.items(), self.share_city.items()):
             data.append([city1, value1, '', city2, value2])
-        ws2 = self.wb.create_sheet('Статистика по городам')
-        for row in data:
-            ws2.append(row)
-
-        column_widths = []
-        for row in data:
-            for i, cell in enumerate(row):
-                cell = str(cell)
-                if len(column_widths) > i:
-                    if len(cell) > column_widths[i]:
-                        column_widths[i] = len(cell)
-                else:
-                    column_widths += [len(cell)]
-
-        for i, column_width in enumerate(column_widths, 1):
-            ws2.column_dimensions[get_column_letter(i)].width = column_width + 2
-
-        font_bold = Font(bold=True)
-        for col in 'ABCDE':
-            ws1[col + '1'].font = font_bold
-            ws2[col + '1'].font = font_bold
-
-        for index, _ in enumerate(self.salary_city):
-            ws2['E' + str(index + 2)].number_format = '0.00%'
-
-        thin = Side(border_style='thin', color='00000000')
-
-        for row in range(len(data)):
-            for col in 'ABDE':
-                ws2[col + str(row + 1)].border = Border(left=thin, bottom=thin, right=thin, top=thin)
-
-        for row, _ in enumerate(self.salary):
-            for col in 'ABCDE':
-                ws1[col + str(row + 1)].border = Border(left=thin, bottom=thin, right=thin, top=thin)
-        self.wb.save('report.xlsx')
-
-
-# vacancy_name = input('Введите название IT-профессии')
-vacancy_name = 'Аналитик'
-dataset = DataSet('vacancies_by_year.csv', vacancy_name)
-report = Report(vacancy_name, *dataset.get_clear_data())
-# choice = input('Отчет, вакансии или статистика?')
-choice = 'Вакансии'
-if choice == 'Отчет':
-    report.generate_pdf()
-elif choice == 'Вакансии':
-    report.generate_image()
-elif choice == 'Статистика':
-    report.generate_excel()
-else:
-    print('Неправильный формат ввода')
+        ws2 = wb.create_sheet('Статистика по городам')
+        for i, column in enumerate(zip(*data), 1):
+            ws2.column_dimensions[get_column_letter(i)].width = max(len(str(cell)) for cell in column) + 2
+        ws2.append(get_styled_row(ws2, data[0], ['report_header', 'report_header', None, 'report_header',
+                                                 'report_header']))
+        for row in data[1:]:
+            ws2.append(get_styled_row(ws2, row, ['report_cell', 'report_cell', None, 'report_cell', 'report_percent']))
+        wb.save('report.xlsx')
+
+
+if __name__ == '__main__':
+    # vacancy_name = input('Введите название IT-профессии')
+    vacancy_name = 'Аналитик'
+    dataset = DataSet('vacancies_by_year.csv', vacancy_name)
+    report = Report(vacancy_name, *dataset.get_clear_data())
+    # choice = input('Отчет, вакансии или статистика?')
+    choice = 'Вакансии'
+    if choice == 'Отчет':
+        report.generate_pdf()
+    elif choice == 'Вакансии':
+        report.generate_image()
+    elif choice == 'Статистика':
+        report.generate_excel()
+    else:
+        print('Неправильный формат ввода')
@@ -1,9 +1,24 @@
+import os
+import tempfile
 from unittest import TestCase, main
+from unittest.mock import patch
 from main import Vacancy, DataSet, Report
 
 vacancy_dct = {'name': 'Программист', 'salary_from': '10', 'salary_to': '20', 'salary_currency': 'RUR',
                'area_name': 'Екатеринбург', 'published_at': '2007-12-03T17:40:09+0300'}
 
+vacancies_csv = """name,salary_from,salary_to,salary_currency,area_name,published_at
+Аналитик,10,20,RUR,Москва,2007-12-03T17:40:09+0300
+Программист,100,200,KZT,Москва,2007-12-04T10:00:00+0300
+Аналитик данных,30,50,RUR,Екатеринбург,2008-01-10T10:00:00+0300
+Программист,,50,RUR,Екатеринбург,2008-01-11T10:00:00+0300
+Программист,10,50,RUR,Екатеринбург,2008-01-12T10:00:00+0300,лишнее
+Программист,10,50,RUR,Екатеринбург,2008-01-12T10:00:00+0300,лишнее,поле
+Программист,10,50,RUR
+None,10,20,RUR,NA,2009-01-01T10:00:00+0300
+null,30,50,RUR,Москва,2009-02-01T10:00:00+0300
+"""
+
 
 class VacancyTest(TestCase):
     def test_vacancy_type(self):
@@ -29,6 +44,16 @@ class VacancyTest(TestCase):
 
 
 class DatasetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8-sig', suffix='.csv', delete=False) as file:
+            file.write(vacancies_csv)
+        cls.file_name = file.name
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls.file_name)
+
     def test_dataset_type(self):
         self.assertEqual(type(DataSet('', '')).__name__, 'DataSet')
 
@@ -38,6 +63,40 @@ class DatasetTest(TestCase):
     def test_dataset_vacancy_name(self):
         self.assertEqual(DataSet('vacancies_by_year.csv', 'Аналитик').vacancy_name, 'Аналитик')
 
+    def test_dataset_parse_csv(self):
+        salary, amount, vacancy_salary, vacancy_amount, salary_city, share_city, count = \
+            DataSet(self.file_name, 'Аналитик').parse_csv()
+        self.assertEqual(count, 5)
+        self.assertEqual(amount, {2007: 2, 2008: 1, 2009: 2})
+        self.assertEqual(vacancy_amount, {2007: 1, 2008: 1})
+        self.assertEqual(share_city, {'Москва': 3, 'Екатеринбург': 1, 'NA': 1})
+        self.assertAlmostEqual(salary[2007], 34.5)
+        self.assertAlmostEqual(vacancy_salary[2008], 40.0)
+
+    def test_dataset_parse_csv_byte_ranges(self):
+        dataset = DataSet(self.file_name, 'Аналитик')
+        expected = dataset.parse_csv()
+        with patch('main.CHUNK_BYTES_MIN', 40), patch('main.CHUNK_BYTES_MAX', 40):
+            self.assertEqual(dataset.parse_csv(), expected)
+
+    def test_dataset_parse_csv_numeric_names(self):
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8-sig', suffix='.csv', delete=False) as file:
+            file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+                       '1,10,20,RUR,Москва,2007-12-03T17:40:09+0300\n'
+                       '2,30,50,RUR,Москва,2008-01-10T10:00:00+0300\n')
+        try:
+            self.assertEqual(DataSet(file.name, '1').parse_csv()[3], {2007: 1})
+        finally:
+            os.remove(file.name)
+
+    def test_dataset_clear_data(self):
+        salary, amount, vacancy_salary, vacancy_amount, salary_city, share_city = \
+            DataSet(self.file_name, 'Аналитик').get_clear_data()
+        self.assertEqual(salary, {2007: 17, 2008: 40, 2009: 27})
+        self.assertEqual(vacancy_salary, {2007: 15, 2008: 40})
+        self.assertEqual(salary_city, {'Екатеринбург': 40, 'Москва': 24, 'NA': 15})
+        self.assertEqual(share_city, {'Москва': 0.6, 'Екатеринбург': 0.2, 'NA': 0.2})
+
 
 class ReportTest(TestCase):
     def test_report_type(self):